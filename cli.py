@@ -1,14 +1,24 @@
 import asyncio
 import argparse
+import functools
 import sys
 from pathlib import Path # Import Path
-import core # Import core directly
 import os # Needed for checking prompt file existence
+from dotenv import load_dotenv
+# core (and its heavy openai/PIL imports) is imported in main() once arguments are validated
+
+# Load .env before the argument defaults below read the environment
+load_dotenv()
 
 # Define the path to the prompts directory relative to this script's location
 # Assuming cli.py is in the root and prompts/ is also in the root.
 PROMPTS_DIR = Path(__file__).parent / "prompts" # Use pathlib for robustness
 
+@functools.lru_cache(maxsize=None)
+def available_prompts() -> tuple[str, ...]:
+    """Lists prompt names in PROMPTS_DIR, scanning the directory only on first use."""
+    return tuple(f.stem for f in PROMPTS_DIR.glob('*.txt'))
+
 def main():
     parser = argparse.ArgumentParser(
         description="Get image from clipboard, send to OpenAI Vision, put text back to clipboard.",
@@ -45,6 +55,40 @@ def main():
         help='Custom OpenAI base URL. Overrides OPENAI_BASE_URL environment variable.'
     )
 
+    parser.add_argument(
+        '--detail',
+        choices=['auto', 'low', 'high'],
+        default='auto',
+        help='OpenAI Vision image detail level. "low" is cheaper and usually enough for plain text.'
+    )
+
+    parser.add_argument(
+        '--no-stream',
+        dest='stream',
+        action='store_false',
+        help='Wait for the complete OpenAI response instead of streaming it.'
+    )
+
+    # Batch mode
+    parser.add_argument(
+        '--batch',
+        type=Path,
+        metavar='DIR',
+        help='OCR every image in DIR concurrently instead of the clipboard image.'
+    )
+    parser.add_argument(
+        '--batch-mode',
+        choices=['submit', 'poll', 'collect'],
+        help='Use the OpenAI Batch API (cheaper, results within 24h): submit images from --batch DIR, '
+             'poll the status of --batch-id, or collect its results into the clipboard.'
+    )
+    parser.add_argument(
+        '--batch-id',
+        type=str,
+        metavar='ID',
+        help='Batch ID returned by --batch-mode submit (required for poll and collect).'
+    )
+
     args = parser.parse_args()
 
     # --- Validate API Key ---
@@ -60,17 +104,39 @@ def main():
     if not final_prompt_file.is_file():
         print(f"❌ Error: Selected prompt file '{prompt_name}.txt' not found in '{PROMPTS_DIR}'.", file=sys.stderr)
         # Suggest available prompts
-        available_prompts = [f.stem for f in PROMPTS_DIR.glob('*.txt')]
-        if available_prompts:
-             print(f"   Available prompts: {', '.join(available_prompts)}", file=sys.stderr)
+        prompt_names = available_prompts()
+        if prompt_names:
+             print(f"   Available prompts: {', '.join(prompt_names)}", file=sys.stderr)
         else:
              print(f"   No prompt files found in '{PROMPTS_DIR}'.", file=sys.stderr)
         sys.exit(1)
 
+    if args.batch is not None and not args.batch.is_dir():
+        print(f"❌ Error: Batch directory '{args.batch}' not found.", file=sys.stderr)
+        sys.exit(1)
+    if args.batch_mode == 'submit' and args.batch is None:
+        print("❌ Error: --batch-mode submit requires --batch DIR.", file=sys.stderr)
+        sys.exit(1)
+    if args.batch_mode in ('poll', 'collect') and not args.batch_id:
+        print(f"❌ Error: --batch-mode {args.batch_mode} requires --batch-id ID.", file=sys.stderr)
+        sys.exit(1)
+
+    import core # Deferred so --help and argument errors return without loading openai/PIL
+
     # Run the OCR process once immediately using the specified prompt
     print(f"🚀 Starting ClipGPT-OCR using prompt: '{prompt_name}'...")
     try:
-        success = asyncio.run(core.run_ocr_process(prompt_name=prompt_name))
+        if args.batch_mode == 'submit':
+            success = asyncio.run(core.run_batch_submit(args.batch, prompt_name=prompt_name, detail=args.detail))
+        elif args.batch_mode == 'poll':
+            success = asyncio.run(core.run_batch_poll(args.batch_id))
+        elif args.batch_mode == 'collect':
+            success = asyncio.run(core.run_batch_collect(args.batch_id))
+        elif args.batch is not None:
+            success = asyncio.run(core.run_batch_process(args.batch, prompt_name=prompt_name, detail=args.detail,
+                                                           stream=args.stream))
+        else:
+            success = asyncio.run(core.run_ocr_process(prompt_name=prompt_name, detail=args.detail, stream=args.stream))
         if not success:
             # Error messages are printed within core functions
             sys.exit(1) # Exit with error code if process failed
@@ -1,17 +1,18 @@
-import base64
+import binascii
+import datetime
+import email.utils
+import functools
 import io
+import json
+import mimetypes
 import os
+import random
 import sys
 import asyncio
-import time # For sleep in retries
+import time # For Retry-After HTTP-dates
 from pathlib import Path
-import pyperclip
-# Import specific exceptions from openai
-from openai import (
-    OpenAI, AsyncOpenAI, APIError, RateLimitError, BadRequestError, APITimeoutError, APIConnectionError
-)
-from PIL import ImageGrab
 from dotenv import load_dotenv
+# openai, httpx, PIL and pyperclip are imported where they are used to keep CLI startup fast
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,12 +20,18 @@ load_dotenv()
 # Define the path to the prompts directory relative to this file
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 
+_prompts_dir_checked = False # Set once PROMPTS_DIR is known to exist
+
+@functools.lru_cache(maxsize=32)
 def load_system_prompt(prompt_name: str = "default") -> str:
-    """Loads the specified prompt file from the prompts directory."""
+    """Loads the specified prompt file from the prompts directory (cached per prompt name)."""
+    global _prompts_dir_checked
     prompt_file = PROMPTS_DIR / f"{prompt_name}.txt"
-    if not PROMPTS_DIR.is_dir():
-         print(f"❌ Error: Prompts directory not found at '{PROMPTS_DIR}'", file=sys.stderr)
-         sys.exit(1)
+    if not _prompts_dir_checked:
+        if not PROMPTS_DIR.is_dir():
+             print(f"❌ Error: Prompts directory not found at '{PROMPTS_DIR}'", file=sys.stderr)
+             sys.exit(1)
+        _prompts_dir_checked = True
     try:
         print(f"🔧 Loading prompt: {prompt_file.name}")
         return prompt_file.read_text(encoding='utf-8')
@@ -41,144 +48,299 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") # Will be None if not set
 
-# Initialize OpenAI client
-# Use AsyncOpenAI for the async function
-try:
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY environment variable not set.")
-
-    client_params = {
-        "api_key": OPENAI_API_KEY,
-    }
-    if OPENAI_BASE_URL:
-        client_params["base_url"] = OPENAI_BASE_URL
-        print(f"🔧 Using custom OpenAI base URL: {OPENAI_BASE_URL}")
-
-    client = AsyncOpenAI(**client_params)
-    # Also initialize a sync client for potential future sync needs or checks
-    sync_client = OpenAI(**client_params)
-    print(f"🤖 Configured to use OpenAI model: {OPENAI_MODEL}")
-
-except (ValueError, Exception) as e:
-    print(f"❌ Error initializing OpenAI client: {e}", file=sys.stderr)
-    if isinstance(e, ValueError):
-         print("   Please set the OPENAI_API_KEY in your environment or .env file.", file=sys.stderr)
-    sys.exit(1)
-
-
-def get_image_from_clipboard() -> bytes | None:
-    """Grabs an image from the clipboard."""
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """Creates the AsyncOpenAI client on first use and returns the same instance afterwards."""
+    # Async client only: a separate sync OpenAI client would bootstrap its own idle connection pool
     try:
+        import httpx
+        from openai import AsyncOpenAI
+
+        if not OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY environment variable not set.")
+
+        client_params = {
+            "api_key": OPENAI_API_KEY,
+        }
+        if OPENAI_BASE_URL:
+            client_params["base_url"] = OPENAI_BASE_URL
+            print(f"🔧 Using custom OpenAI base URL: {OPENAI_BASE_URL}")
+
+        # Explicit pooled HTTP/2 client so connection reuse and timeouts are visible and tunable
+        timeout = httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=5.0)
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0),
+            timeout=timeout,
+        )
+        # max_retries=0: ocr_and_rewrite's jittered, capped backoff is the only retry policy
+        # The SDK applies its own timeout to every request, so give it the same per-phase bounds
+        client = AsyncOpenAI(**client_params, http_client=http_client, max_retries=0, timeout=timeout)
+        print(f"🤖 Configured to use OpenAI model: {OPENAI_MODEL}")
+        return client
+
+    except (ValueError, Exception) as e:
+        print(f"❌ Error initializing OpenAI client: {e}", file=sys.stderr)
+        if isinstance(e, ValueError):
+             print("   Please set the OPENAI_API_KEY in your environment or .env file.", file=sys.stderr)
+        sys.exit(1)
+
+
+async def _copy_to_clipboard(text: str):
+    """Copies text to the clipboard without blocking the event loop."""
+    import pyperclip
+    # pyperclip may spawn xclip/pbcopy, keep it off the event loop
+    await asyncio.to_thread(pyperclip.copy, text)
+
+
+# Images with more pixels than this are sent as JPEG instead of PNG (zlib dominates encode time)
+JPEG_MIN_PIXELS = 2_000_000
+JPEG_QUALITY = 85
+# OpenAI Vision downsamples larger images server-side anyway; shrink before upload
+MAX_IMAGE_SIDE = 2048
+SUPPORTED_IMAGE_MIMES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+# Images with fewer pixels than MIN_IMAGE_SIDE x MIN_IMAGE_SIDE have nothing to OCR
+# (compared by area so thin single-line captures still go through)
+MIN_IMAGE_SIDE = 32
+FEW_COLORS_WARNING = 16 # Note when an image has this many colors or fewer (UI chrome or bitmap-font text)
+
+def _degenerate_image_reason(im) -> str | None:
+    """Returns why an image has nothing to OCR (too small, blank, solid color), or None if it looks usable."""
+    width, height = im.size
+    if width * height < MIN_IMAGE_SIDE ** 2:
+        return f"too small ({width}x{height})"
+    if im.getbbox() is None:
+        return "blank"
+    extrema = im.getextrema()
+    if not isinstance(extrema[0], tuple):
+        extrema = (extrema,) # Single-band images return one (min, max) pair
+    if all(low == high for low, high in extrema):
+        return "a single solid color"
+    return None
+
+
+def _encode_image(im) -> tuple[bytes, str]:
+    """Downscales an image to MAX_IMAGE_SIDE if needed and encodes it. Returns (image bytes, MIME type)."""
+    from PIL import Image
+    if max(im.size) > MAX_IMAGE_SIDE:
+        original_size = im.size
+        im.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.Resampling.LANCZOS)
+        print(f"📐 Downscaled image from {original_size[0]}x{original_size[1]} to {im.size[0]}x{im.size[1]}.")
+    buf = io.BytesIO()
+    width, height = im.size
+    if im.mode == "RGB" and width * height > JPEG_MIN_PIXELS:
+        # Large opaque images compress far faster as JPEG than as PNG
+        im.save(buf, format="JPEG", quality=JPEG_QUALITY)
+        mime = "image/jpeg"
+    else:
+        # Favor speed over size: zlib level 1 is several times faster than the default
+        im.save(buf, format="PNG", optimize=False, compress_level=1)
+        mime = "image/png"
+    # getvalue() on a fresh BytesIO shares its buffer instead of copying it
+    img_bytes = buf.getvalue()
+    raw_size = width * height * len(im.getbands())
+    print(f"🗜️ Encoded {mime} image: {len(img_bytes) / 1024:.0f} KB ({raw_size / max(len(img_bytes), 1):.1f}x compression).")
+    return img_bytes, mime
+
+
+def _read_image_file(path: Path, mime: str) -> tuple[bytes, str]:
+    """
+    Reads an image file. Files within MAX_IMAGE_SIDE are returned as-is;
+    larger ones are downscaled and re-encoded like clipboard images.
+    """
+    from PIL import Image, ImageOps
+    with Image.open(path) as im:
+        if max(im.size) <= MAX_IMAGE_SIDE:
+            return path.read_bytes(), mime
+        # Re-encoding drops EXIF, so bake the camera orientation into the pixels first
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA", "L", "LA"):
+            im = im.convert("RGBA") # e.g. palette or CMYK images, which PNG/JPEG can't all take
+        return _encode_image(im)
+
+
+def get_image_from_clipboard() -> tuple[bytes, str] | None:
+    """Grabs an image from the clipboard. Returns (image bytes, MIME type)."""
+    try:
+        from PIL import ImageGrab
         im = ImageGrab.grabclipboard()
         if im is None:
             return None
+        # On macOS/Linux the clipboard may hold copied files; send them without re-encoding unless oversized
+        if isinstance(im, list):
+            for filename in im:
+                mime, _ = mimetypes.guess_type(filename)
+                if mime in SUPPORTED_IMAGE_MIMES:
+                    return _read_image_file(Path(filename), mime)
+            print("📋 Clipboard files are not a supported image format.", file=sys.stderr)
+            return None
         # Check if it's actually an image object (PIL formats)
         if not hasattr(im, 'save'):
              print("📋 Clipboard content is not a recognized image format.", file=sys.stderr)
              return None
-        buf = io.BytesIO()
-        # Ensure saving as PNG, as specified in the API call format
-        im.save(buf, format="PNG")
-        img_bytes = buf.getvalue()
+        # Skip the API round-trip entirely for accidental captures
+        reason = _degenerate_image_reason(im)
+        if reason is not None:
+            print(f"📋 Clipboard image is {reason}, nothing to OCR.", file=sys.stderr)
+            return None
+        if im.getcolors(maxcolors=FEW_COLORS_WARNING) is not None:
+            print("ℹ️ Clipboard image has very few colors (likely UI chrome or a bitmap font).", file=sys.stderr)
+        img_bytes, mime = _encode_image(im)
         # Optional: Check image size before sending (OpenAI limit is ~20MB, but practically lower for base64)
         # size_mb = len(img_bytes) / (1024 * 1024)
         # if size_mb > 15: # Example threshold, adjust as needed
         #     print(f"⚠️ Warning: Image size ({size_mb:.2f} MB) is large, might exceed API limits.", file=sys.stderr)
-        return img_bytes
+        return img_bytes, mime
     except Exception as e:
         # Catch potential errors during clipboard access or image processing
         print(f"❌ Error getting image from clipboard: {e}", file=sys.stderr)
         return None
 
 
+def encode_image_data_uri(img_bytes: bytes, mime: str = "image/png") -> str:
+    """Encodes image bytes as a base64 data URI."""
+    # Chat Completions only accepts image URLs or data URIs; uploaded file IDs can't be referenced
+    # as images there, so large images are shrunk (MAX_IMAGE_SIDE) rather than sent via the Files API
+    # Encode straight to a single ASCII str and build the data URI with one concat,
+    # avoiding the intermediate bytes copy of base64.b64encode()
+    return f"data:{mime};base64," + binascii.b2a_base64(img_bytes, newline=False).decode('ascii')
+
+
+_USER_TEXT = "Process the text from the image according to the system instructions."
+
+@functools.lru_cache(maxsize=32)
+def _system_msg(system_prompt: str) -> dict:
+    """Returns the system message for a prompt, shared across requests (must not be mutated)."""
+    return {"role": "system", "content": system_prompt}
+
+
+def build_messages(system_prompt: str, image_url: str, detail: str = "auto") -> list[dict]:
+    """Builds the chat messages for one OCR request. Only the image part is new per call."""
+    return [
+        _system_msg(system_prompt),
+        {"role": "user", "content": [
+            {"type": "text", "text": _USER_TEXT},
+            {"type": "image_url", "image_url": {"url": image_url, "detail": detail}}
+        ]} # Close content list
+    ] # Close messages list
+
+
 MAX_RETRIES = 3
-INITIAL_BACKOFF = 1 # seconds
+BASE_DELAY = 1.0 # seconds, delay before the first retry
+MAX_DELAY = 30.0 # seconds, upper bound for any single backoff
+BACKOFF_JITTER = 0.5 # up to +50% random spread so concurrent clients don't retry in lockstep
 
-async def ocr_and_rewrite(img_bytes: bytes, system_prompt: str) -> str | None:
+def _parse_retry_after(value: str, now: float) -> float | None:
+    """
+    Parses a Retry-After header (delay in seconds, possibly fractional, or an
+    HTTP-date) into seconds to wait, clamped to [0, MAX_DELAY]. Returns None
+    if the value can't be parsed.
+    """
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc) # HTTP-dates are always GMT
+        delay = retry_at.timestamp() - now
+    if delay != delay: # NaN
+        return None
+    return min(MAX_DELAY, max(0.0, delay))
+
+
+async def _read_stream(stream) -> tuple[str, str | None]:
+    """Collects a streamed chat completion. Returns (content, finish reason of the terminal chunk)."""
+    parts = []
+    finish_reason = None
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta and choice.delta.content:
+            parts.append(choice.delta.content)
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+    return "".join(parts), finish_reason
+
+
+async def ocr_and_rewrite(img_bytes: bytes, system_prompt: str, mime: str = "image/png", detail: str = "auto",
+                          stream: bool = True) -> str | None:
     """
     Encodes image, sends to OpenAI with retries and specific error handling,
-    returns the text response.
+    returns the text response. With stream=True the response is consumed
+    incrementally as tokens arrive.
     """
+    from openai import (
+        APIError, APIStatusError, RateLimitError, BadRequestError, APITimeoutError, APIConnectionError
+    )
+    # Transient failures worth retrying; 5xx status errors are retried separately
+    retryable_errors = (APITimeoutError, APIConnectionError, RateLimitError)
+
     try:
-        b64_image = base64.b64encode(img_bytes).decode('utf-8')
+        image_url = encode_image_data_uri(img_bytes, mime)
     except Exception as e:
         print(f"❌ Error encoding image to Base64: {e}", file=sys.stderr)
         return None
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": [
-            {"type": "text", "text": "Process the text from the image according to the system instructions."},
-            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64_image}"}}
-        ]} # Close content list
-    ] # Close messages list
-
-    current_retry = 0
-    backoff_time = INITIAL_BACKOFF
+    # Built once and reused as-is by every retry attempt below
+    messages = build_messages(system_prompt, image_url, detail)
 
-    while current_retry <= MAX_RETRIES:
+    for current_retry in range(MAX_RETRIES + 1):
+        retry_after = None # Server-suggested wait, overrides the jittered backoff when set
         try:
             print(f"🤖 Sending request to OpenAI model: {OPENAI_MODEL} (Attempt {current_retry + 1}/{MAX_RETRIES + 1})...")
-            resp = await client.chat.completions.create(
+            resp = await get_client().chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=messages,
-                timeout=60, # Increased timeout for potentially larger images/slower responses
+                stream=stream,
             )
+            if stream:
+                # Tokens arrive incrementally; errors mid-stream are handled like request errors below
+                content, finish_reason = await _read_stream(resp)
+            else:
+                message = resp.choices[0].message if resp.choices else None
+                content = message.content if message else None
+                finish_reason = resp.choices[0].finish_reason if resp.choices else None
             # Basic check for response structure
-            if resp.choices and resp.choices[0].message and resp.choices[0].message.content:
-                 extracted_text = resp.choices[0].message.content.strip()
+            if content:
+                 extracted_text = content.strip()
                  print("✅ Received response from OpenAI.")
                  return extracted_text
             else:
                  # Handle cases where the response might be empty or structured differently
-                 finish_reason = resp.choices[0].finish_reason if resp.choices else "unknown"
+                 finish_reason = finish_reason or "unknown"
                  if finish_reason == "content_filter":
                       print("❌ OpenAI response blocked due to content filter.", file=sys.stderr)
                  elif finish_reason == "length":
                       print("⚠️ OpenAI response truncated due to max_tokens limit.", file=sys.stderr)
                       # Return truncated content if available
-                      if resp.choices and resp.choices[0].message and resp.choices[0].message.content is not None:
-                           return resp.choices[0].message.content.strip()
+                      if content is not None:
+                           return content.strip()
                  else:
                       print(f"❌ OpenAI response structure unexpected or empty (Finish reason: {finish_reason}).", file=sys.stderr)
-                      print(f"Full response: {resp}", file=sys.stderr)
+                      if not stream:
+                           print(f"Full response: {resp}", file=sys.stderr)
                  return None # Don't retry on unexpected structure or content filter
 
-        except APITimeoutError as e:
-            print(f"⏳ OpenAI API request timed out: {e}", file=sys.stderr)
-            # Retryable
-        except APIConnectionError as e:
-            print(f"🌐 OpenAI API connection error: {e}", file=sys.stderr)
-            # Retryable
-        except APIError as e:
-            # Retry on server errors (5xx), but not client errors (4xx) unless specified
-            if e.status_code >= 500:
-                print(f"🔧 OpenAI API server error ({e.status_code}): {e}", file=sys.stderr)
-                # Retryable
+        except retryable_errors as e:
+            retryable = True
+            if isinstance(e, RateLimitError):
+                print(f"🚦 OpenAI API rate limit exceeded: {e}", file=sys.stderr)
+                retry_after_str = e.response.headers.get("Retry-After")
+                if retry_after_str:
+                    # Falls back to jittered backoff (None) if the header can't be parsed
+                    retry_after = _parse_retry_after(retry_after_str, time.time())
+                    if retry_after is not None:
+                        print(f"   Rate limit suggests waiting {retry_after:.2f} seconds.")
+            elif isinstance(e, APITimeoutError):
+                print(f"⏳ OpenAI API request timed out: {e}", file=sys.stderr)
             else:
-                print(f"❌ OpenAI API client error ({e.status_code}): {e}", file=sys.stderr)
-                if e.code == 'invalid_api_key':
-                     print("   🔑 Please check your OPENAI_API_KEY.", file=sys.stderr)
-                # Add more specific checks if needed based on e.code or e.body
-                return None # Non-retryable client error
-        except RateLimitError as e:
-            print(f"🚦 OpenAI API rate limit exceeded: {e}", file=sys.stderr)
-            # Consider parsing e.response.headers.get("Retry-After") for smarter backoff
-            retry_after_str = e.response.headers.get("Retry-After")
-            wait_time = backoff_time # Default backoff if header not present/parsable
-            if retry_after_str:
-                try:
-                    wait_time = int(retry_after_str) + 1 # Add a buffer
-                    print(f"   Rate limit suggests waiting {wait_time} seconds.")
-                except ValueError:
-                    pass # Use default backoff if header is not an integer
-            backoff_time = wait_time # Use suggested wait time if available
-            # Decide whether to retry based on MAX_RETRIES or just give up
-            # For simplicity here, we'll retry using the adjusted backoff_time if within MAX_RETRIES
-            print(f"   Will attempt retry if within limit ({current_retry + 1} <= {MAX_RETRIES + 1}).")
-            # Retryable (with potentially longer backoff)
-
+                print(f"🌐 OpenAI API connection error: {e}", file=sys.stderr)
         except BadRequestError as e:
+            retryable = False
             print(f"🚫 OpenAI API bad request error: {e}", file=sys.stderr)
             error_body = e.body or {}
             error_code = error_body.get("code", "")
@@ -192,45 +354,153 @@ async def ocr_and_rewrite(img_bytes: bytes, system_prompt: str) -> str | None:
                  print(f"   🤔 Invalid request structure or parameters. Details: {error_message}", file=sys.stderr)
             else:
                  print(f"   Details: Code={error_code}, Message={error_message}", file=sys.stderr)
-            return None # Non-retryable
+        except APIStatusError as e:
+            # Retry on server errors (5xx), but not client errors (4xx)
+            retryable = e.status_code >= 500
+            if retryable:
+                print(f"🔧 OpenAI API server error ({e.status_code}): {e}", file=sys.stderr)
+            else:
+                print(f"❌ OpenAI API client error ({e.status_code}): {e}", file=sys.stderr)
+                if e.code == 'invalid_api_key':
+                     print("   🔑 Please check your OPENAI_API_KEY.", file=sys.stderr)
+                # Add more specific checks if needed based on e.code or e.body
+        except APIError as e:
+            # Errors without an HTTP status, e.g. an error event in the middle of a stream
+            retryable = False
+            print(f"❌ OpenAI API error: {e}", file=sys.stderr)
         except Exception as e:
             # Catch any other unexpected exceptions during the API call
+            retryable = False
             print(f"❌ Unexpected error during OpenAI API call: {type(e).__name__}: {e}", file=sys.stderr)
-            return None # Non-retryable
 
         # --- Retry Logic ---
-        current_retry += 1
-        if current_retry <= MAX_RETRIES:
-            print(f"   Retrying in {backoff_time:.2f} seconds...")
-            await asyncio.sleep(backoff_time)
-            # Exponential backoff only if not overridden by RateLimitError header
-            if not isinstance(e, RateLimitError):
-                 backoff_time *= 2
-        else:
+        if not retryable:
+            return None
+        if current_retry >= MAX_RETRIES:
+            # Don't sleep (or honor Retry-After) when no attempt is left
             print("❌ Max retries reached. Failed to get response from OpenAI.", file=sys.stderr)
             return None
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            # Jittered exponential backoff driven by the attempt number, capped at MAX_DELAY
+            delay = min(MAX_DELAY, BASE_DELAY * (2 ** current_retry) * (1 + random.random() * BACKOFF_JITTER))
+        print(f"   Retrying in {delay:.2f} seconds...")
+        await asyncio.sleep(delay)
 
     return None # Should theoretically not be reached
 
 
-async def run_ocr_process(prompt_name: str = "default"):
+DEFAULT_CONCURRENCY = 10 # Max in-flight OpenAI requests in batch mode
+
+def load_images_from_dir(directory: Path) -> list[tuple[Path, bytes, str]]:
+    """
+    Reads all supported image files in a directory, downscaling oversized ones.
+    Returns (path, bytes, MIME type) sorted by name.
+    """
+    images = []
+    for path in sorted(directory.iterdir()):
+        mime, _ = mimetypes.guess_type(path.name)
+        if path.is_file() and mime in SUPPORTED_IMAGE_MIMES:
+            images.append((path, *_read_image_file(path, mime)))
+    return images
+
+
+async def run_ocr_one(img_bytes: bytes, system_prompt: str, sem: asyncio.Semaphore, mime: str = "image/png",
+                      detail: str = "auto", stream: bool = True) -> str | None:
+    """Runs ocr_and_rewrite for one image, waiting for a free slot in the semaphore."""
+    async with sem:
+        return await ocr_and_rewrite(img_bytes, system_prompt, mime, detail, stream)
+
+
+async def run_ocr_many(images, prompt_name: str = "default", concurrency: int = DEFAULT_CONCURRENCY,
+                       detail: str = "auto", stream: bool = True) -> list[str | None]:
+    """
+    OCRs an iterable of (image bytes, MIME type) concurrently, with at most
+    `concurrency` requests in flight. Results are returned in input order.
+    """
+    system_prompt = load_system_prompt(prompt_name)
+    sem = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*[
+        run_ocr_one(img_bytes, system_prompt, sem, mime, detail, stream) for img_bytes, mime in images
+    ])
+
+
+async def run_batch_process(directory: Path, prompt_name: str = "default", concurrency: int = DEFAULT_CONCURRENCY,
+                            detail: str = "auto", stream: bool = True):
+    """Batch logic: OCR every image in a directory, copy the combined text to clipboard."""
+    return await _closing_client(_run_batch_process(directory, prompt_name, concurrency, detail, stream))
+
+
+async def _run_batch_process(directory: Path, prompt_name: str, concurrency: int, detail: str, stream: bool):
+    print(f"📂 Reading images from '{directory}'...")
+    try:
+        images = await asyncio.to_thread(load_images_from_dir, directory)
+    except OSError as e:
+        print(f"❌ Error reading images from '{directory}': {e}", file=sys.stderr)
+        return False
+
+    if not images:
+        print(f"❌ No supported images found in '{directory}'.")
+        return False
+
+    print(f"🖼️ Found {len(images)} image(s), processing with OpenAI using prompt '{prompt_name}' (concurrency {concurrency})...")
+    results = await run_ocr_many(((img_bytes, mime) for _, img_bytes, mime in images), prompt_name, concurrency, detail, stream)
+
+    texts = []
+    for (path, _, _), text in zip(images, results):
+        if text is None:
+            print(f"❌ Failed to get text for '{path.name}'.", file=sys.stderr)
+        else:
+            texts.append(text)
+    if not texts:
+        print("❌ Failed to get text from OpenAI.")
+        return False
+
+    try:
+        await _copy_to_clipboard("\n\n".join(texts))
+        print(f"✅ Text from {len(texts)}/{len(images)} image(s) copied to clipboard!")
+    except Exception as e:
+        print(f"❌ Error copying text to clipboard: {e}", file=sys.stderr)
+        return False
+    return len(texts) == len(images) # Indicate failure if any image failed
+
+
+async def _closing_client(coro):
+    """Awaits coro, then closes the pooled HTTP client if one was created."""
+    try:
+        return await coro
+    finally:
+        # Close pooled connections while the event loop that opened them is still running
+        if get_client.cache_info().currsize:
+            await get_client().close()
+            get_client.cache_clear() # The next run gets a fresh client
+
+
+async def run_ocr_process(prompt_name: str = "default", detail: str = "auto", stream: bool = True):
     """Main async logic: get image, load prompt, OCR, copy to clipboard."""
+    return await _closing_client(_run_ocr_process(prompt_name, detail, stream))
+
+
+async def _run_ocr_process(prompt_name: str, detail: str, stream: bool):
     # Load the specified system prompt
     system_prompt = load_system_prompt(prompt_name)
 
     print("📋 Checking clipboard for image...")
-    img_bytes = get_image_from_clipboard()
+    # Clipboard access is blocking (may spawn xclip/pbpaste), keep it off the event loop
+    image = await asyncio.to_thread(get_image_from_clipboard)
 
-    if img_bytes is None:
+    if image is None:
         print("❌ No image found in clipboard.")
         return False # Indicate failure
 
+    img_bytes, mime = image
     print(f"🖼️ Image found, processing with OpenAI using prompt '{prompt_name}'...")
-    extracted_text = await ocr_and_rewrite(img_bytes, system_prompt) # Pass the loaded prompt
+    extracted_text = await ocr_and_rewrite(img_bytes, system_prompt, mime, detail, stream) # Pass the loaded prompt
 
     if extracted_text is not None:
         try:
-            pyperclip.copy(extracted_text)
+            await _copy_to_clipboard(extracted_text)
             print("✅ Text successfully copied to clipboard!")
             return True # Indicate success
         except Exception as e:
@@ -240,6 +510,161 @@ async def run_ocr_process(prompt_name: str = "default"):
         print("❌ Failed to get text from OpenAI.")
         return False # Indicate failure
 
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+async def ocr_batch_submit(images, system_prompt: str, detail: str = "auto"):
+    """
+    Submits an iterable of (custom_id, image bytes, MIME type) to the OpenAI
+    Batch API (half the cost of real-time requests, results within 24h).
+    Returns the created batch object.
+    """
+    lines = []
+    for custom_id, img_bytes, mime in images:
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {"model": OPENAI_MODEL, "messages": build_messages(system_prompt, encode_image_data_uri(img_bytes, mime), detail)},
+        }))
+    client = get_client()
+    batch_file = await client.files.create(
+        file=("clipocr-batch.jsonl", "\n".join(lines).encode('utf-8')),
+        purpose="batch",
+    )
+    return await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+
+
+BATCH_PENDING_STATUSES = ("validating", "in_progress", "finalizing", "cancelling")
+
+async def ocr_batch_collect(batch_id: str) -> tuple[dict[str, str | None], int] | None:
+    """
+    Downloads the results of a finished batch. Returns a mapping of
+    custom_id to extracted text (None for failed requests) and the number of
+    requests in the batch, or None if the batch has not finished yet.
+    """
+    client = get_client()
+    batch = await client.batches.retrieve(batch_id)
+    if batch.status in BATCH_PENDING_STATUSES:
+        print(f"⏳ Batch '{batch_id}' is not ready (status: {batch.status}).", file=sys.stderr)
+        return None
+    if batch.status != "completed":
+        # expired/cancelled batches may still have partial results; failed ones never do
+        print(f"⚠️ Batch '{batch_id}' ended with status: {batch.status}.", file=sys.stderr)
+    if batch.errors and batch.errors.data:
+        for error in batch.errors.data:
+            print(f"❌ Batch error: {error.message}", file=sys.stderr)
+
+    results = {}
+    # Successful requests go to the output file, failed ones to the error file
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        content = await client.files.content(file_id)
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            choices = (response.get("body") or {}).get("choices") or []
+            if response.get("status_code") == 200 and choices and choices[0]["message"].get("content"):
+                results[record["custom_id"]] = choices[0]["message"]["content"].strip()
+            else:
+                print(f"❌ Batch request '{record['custom_id']}' failed: {record.get('error') or response}", file=sys.stderr)
+                results[record["custom_id"]] = None
+
+    counts = batch.request_counts
+    total = counts.total if counts is not None else len(results)
+    if not results:
+        print(f"❌ Batch '{batch_id}' finished ({batch.status}) with no output.", file=sys.stderr)
+    elif len(results) < total:
+        print(f"⚠️ Batch returned results for {len(results)} of {total} request(s).", file=sys.stderr)
+    return results, max(total, len(results))
+
+
+async def run_batch_submit(directory: Path, prompt_name: str = "default", detail: str = "auto"):
+    """Batch API logic: submit every image in a directory, print the batch ID."""
+    return await _closing_client(_run_batch_submit(directory, prompt_name, detail))
+
+
+async def _run_batch_submit(directory: Path, prompt_name: str, detail: str):
+    from openai import APIError
+    system_prompt = load_system_prompt(prompt_name)
+    print(f"📂 Reading images from '{directory}'...")
+    try:
+        images = await asyncio.to_thread(load_images_from_dir, directory)
+    except OSError as e:
+        print(f"❌ Error reading images from '{directory}': {e}", file=sys.stderr)
+        return False
+
+    if not images:
+        print(f"❌ No supported images found in '{directory}'.")
+        return False
+
+    print(f"📤 Submitting {len(images)} image(s) to the OpenAI Batch API using prompt '{prompt_name}'...")
+    try:
+        batch = await ocr_batch_submit(((path.name, img_bytes, mime) for path, img_bytes, mime in images), system_prompt, detail)
+    except APIError as e:
+        print(f"❌ Error submitting batch: {e}", file=sys.stderr)
+        return False
+    print(f"✅ Batch submitted: {batch.id} (status: {batch.status})")
+    print(f"   Check it with --batch-mode poll --batch-id {batch.id}")
+    return True
+
+
+async def run_batch_poll(batch_id: str):
+    """Batch API logic: print the status of a submitted batch."""
+    return await _closing_client(_run_batch_poll(batch_id))
+
+
+async def _run_batch_poll(batch_id: str):
+    from openai import APIError
+    try:
+        batch = await get_client().batches.retrieve(batch_id)
+    except APIError as e:
+        print(f"❌ Error retrieving batch '{batch_id}': {e}", file=sys.stderr)
+        return False
+    counts = batch.request_counts
+    print(f"📊 Batch {batch.id}: {batch.status}")
+    if counts is not None:
+        print(f"   Completed {counts.completed}/{counts.total}, failed {counts.failed}")
+    return True
+
+
+async def run_batch_collect(batch_id: str):
+    """Batch API logic: download a completed batch, copy the combined text to clipboard."""
+    return await _closing_client(_run_batch_collect(batch_id))
+
+
+async def _run_batch_collect(batch_id: str):
+    from openai import APIError
+    try:
+        collected = await ocr_batch_collect(batch_id)
+    except APIError as e:
+        print(f"❌ Error collecting batch '{batch_id}': {e}", file=sys.stderr)
+        return False
+    if collected is None:
+        return False
+    results, total = collected
+
+    # custom_ids are image file names; sort to match submission order
+    texts = [results[custom_id] for custom_id in sorted(results) if results[custom_id] is not None]
+    if not texts:
+        print("❌ Batch produced no text.")
+        return False
+
+    try:
+        await _copy_to_clipboard("\n\n".join(texts))
+        print(f"✅ Text from {len(texts)}/{total} image(s) copied to clipboard!")
+    except Exception as e:
+        print(f"❌ Error copying text to clipboard: {e}", file=sys.stderr)
+        return False
+    return len(texts) == total # Indicate failure if any request failed or is missing
+
 # Example of how to run the async function if this file were executed directly
 # if __name__ == "__main__":
 #     # Example: asyncio.run(run_ocr_process(prompt_name="markdown"))